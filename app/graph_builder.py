@@ -32,6 +32,11 @@ ROAD_PENALTIES = {
     'trunk': 2.5,
 }
 
+def graph_fingerprint():
+    # Changes whenever the cached graph is rebuilt, so derived caches can detect staleness
+    st = os.stat(GRAPH_FILE)
+    return f"{st.st_size}-{st.st_mtime_ns}"
+
 def load_graph():
     # If graph exists, just load it
     if os.path.exists(GRAPH_FILE):
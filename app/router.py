@@ -2,6 +2,17 @@ import math
 import networkx as nx
 from scipy.spatial import cKDTree
 from app.graph_builder import load_graph
+from app.trailhead_builder import load_trees
+
+SURFACE_SCORES = {
+    'footway': 100, 'path': 100, 'bridleway': 100, 'track': 100,
+    'cycleway': 90,
+    'unclassified': 50, 'tertiary': 50, 'tertiary_link': 50,
+    'residential': 30, 'living_street': 30, 'service': 30,
+    'primary': 0, 'primary_link': 0, 'secondary': 0, 'secondary_link': 0, 
+    'trunk': 0, 'trunk_link': 0,
+    'unknown': 50
+}
 
 
 def to_gpx(route_data):
@@ -115,6 +126,7 @@ class RoutePlanner:
         print("Initializing RoutePlanner...")
         self.graph = load_graph()
         self._build_spatial_index()
+        self.trailheads = load_trees(self.node_ids)
         print(f"RoutePlanner ready with {self.graph.number_of_nodes()} nodes")
     
     def _build_spatial_index(self):
@@ -138,7 +150,12 @@ class RoutePlanner:
             return {"success": False, "error": "Points too far from road network"}
         
         try:
-            path_nodes = nx.dijkstra_path(self.graph, start_node, end_node, weight="weight")
+            # Routes from/to a trailhead are a walk back up its precomputed tree
+            path_nodes = None
+            if self.trailheads is not None:
+                path_nodes = self.trailheads.path(start_node, end_node)
+            if path_nodes is None:
+                path_nodes = nx.dijkstra_path(self.graph, start_node, end_node, weight="weight")
             
             path_coords = []
             total_dist = 0
@@ -154,16 +171,6 @@ class RoutePlanner:
             crossings_count = 0
             prev_score = None
             
-            SURFACE_SCORES = {
-                'footway': 100, 'path': 100, 'bridleway': 100, 'track': 100,
-                'cycleway': 90,
-                'unclassified': 50, 'tertiary': 50, 'tertiary_link': 50,
-                'residential': 30, 'living_street': 30, 'service': 30,
-                'primary': 0, 'primary_link': 0, 'secondary': 0, 'secondary_link': 0, 
-                'trunk': 0, 'trunk_link': 0,
-                'unknown': 50
-            }
-            
             for i, node in enumerate(path_nodes):
                 data = self.graph.nodes[node]
                 lat, lon = mercator_to_lat_lon(data['x'], data['y'])
@@ -0,0 +1,185 @@
+import os
+import gzip
+import sqlite3
+import numpy as np
+import mapbox_vector_tile
+from shapely import clip_by_rect
+from shapely.geometry import MultiLineString
+from shapely.ops import linemerge
+from app.graph_builder import graph_fingerprint
+from app.router import SURFACE_SCORES, mercator_to_lat_lon
+
+TILES_FILE = "devon_tiles.mbtiles"
+LAYER_NAME = "network"
+MIN_ZOOM = 11
+MAX_ZOOM = 16
+TILE_EXTENT = 4096   # MVT coordinate resolution per tile
+TILE_BUFFER = 64     # Extra extent units kept around each tile so lines don't stop at the edge
+SIMPLIFY_PX = 0.5    # Simplification tolerance in screen pixels (256px tiles)
+WORLD_ORIGIN = 20037508.34  # Graph coordinates are Web Mercator (SRID 3857)
+
+
+def _tile_bounds(z, x, y):
+    """Web Mercator bounds (minx, miny, maxx, maxy) of an XYZ tile."""
+    size = 2 * WORLD_ORIGIN / (2 ** z)
+    minx = -WORLD_ORIGIN + x * size
+    maxy = WORLD_ORIGIN - y * size
+    return minx, maxy - size, minx + size, maxy
+
+
+def _edge_arrays(G):
+    """Flatten the graph into parallel edge arrays (x1, y1, x2, y2, highway)."""
+    n = G.number_of_edges()
+    coords = np.empty((n, 4), dtype=np.float64)
+    highways = np.empty(n, dtype=object)
+    nodes = G.nodes
+    for i, (u, v, d) in enumerate(G.edges(data=True)):
+        coords[i] = (nodes[u]['x'], nodes[u]['y'], nodes[v]['x'], nodes[v]['y'])
+        raw_type = d.get('highway', 'unknown')
+        highways[i] = raw_type[0] if isinstance(raw_type, list) else str(raw_type)
+    return coords, highways
+
+
+def _tiles_for_zoom(coords, z):
+    """Yield (x, y, edge_indices) for every tile touched by an edge at zoom z."""
+    size = 2 * WORLD_ORIGIN / (2 ** z)
+    tx1 = np.floor((coords[:, 0] + WORLD_ORIGIN) / size).astype(np.int64)
+    ty1 = np.floor((WORLD_ORIGIN - coords[:, 1]) / size).astype(np.int64)
+    tx2 = np.floor((coords[:, 2] + WORLD_ORIGIN) / size).astype(np.int64)
+    ty2 = np.floor((WORLD_ORIGIN - coords[:, 3]) / size).astype(np.int64)
+
+    # Emit every tile in each edge's tile bounding box; the clip in _encode_tile
+    # drops the parts that don't actually pass through a given tile
+    x0, y0 = np.minimum(tx1, tx2), np.minimum(ty1, ty2)
+    w = np.abs(tx2 - tx1) + 1
+    n = w * (np.abs(ty2 - ty1) + 1)
+    edge_idx = np.repeat(np.arange(len(coords)), n)
+    local = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+    w = np.repeat(w, n)
+    tx = np.repeat(x0, n) + local % w
+    ty = np.repeat(y0, n) + local // w
+    keys = tx * (2 ** z) + ty
+
+    order = np.argsort(keys, kind="stable")
+    keys, edge_idx = keys[order], edge_idx[order]
+    unique_keys, starts = np.unique(keys, return_index=True)
+    for key, group in zip(unique_keys, np.split(edge_idx, starts[1:])):
+        yield int(key // (2 ** z)), int(key % (2 ** z)), group
+
+
+def _encode_tile(coords, highways, edge_idx, z, x, y):
+    """Merge, clip and simplify one tile's edges, returning gzipped MVT bytes."""
+    bounds = _tile_bounds(z, x, y)
+    size = bounds[2] - bounds[0]
+    pad = size * TILE_BUFFER / TILE_EXTENT
+    tolerance = size / 256 * SIMPLIFY_PX
+
+    by_type = {}
+    for i in edge_idx:
+        x1, y1, x2, y2 = coords[i]
+        by_type.setdefault(highways[i], []).append(((x1, y1), (x2, y2)))
+
+    features = []
+    for road_type, segments in by_type.items():
+        geom = clip_by_rect(MultiLineString(segments),
+                            bounds[0] - pad, bounds[1] - pad, bounds[2] + pad, bounds[3] + pad)
+        if geom.is_empty:
+            continue
+        geom = linemerge(geom) if geom.geom_type == "MultiLineString" else geom
+        geom = geom.simplify(tolerance, preserve_topology=False)
+        if geom.is_empty:
+            continue
+        features.append({
+            "geometry": geom,
+            "properties": {
+                "highway": road_type,
+                "surface_score": SURFACE_SCORES.get(road_type, 50),
+            },
+        })
+
+    if not features:
+        return None
+    tile = mapbox_vector_tile.encode(
+        [{"name": LAYER_NAME, "features": features}],
+        default_options={"quantize_bounds": bounds, "extents": TILE_EXTENT},
+    )
+    return gzip.compress(tile)
+
+
+def build_tiles(G, path=TILES_FILE):
+    """Render the walkable network into an MBTiles cache, one zoom level at a time."""
+    print("--- 🗺️ BUILDING NETWORK TILES FROM GRAPH ---")
+    coords, highways = _edge_arrays(G)
+
+    tmp_path = path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    conn.execute("CREATE TABLE metadata (name TEXT, value TEXT)")
+    conn.execute("CREATE TABLE tiles (zoom_level INTEGER, tile_column INTEGER, "
+                 "tile_row INTEGER, tile_data BLOB)")
+    conn.execute("CREATE UNIQUE INDEX tile_index ON tiles (zoom_level, tile_column, tile_row)")
+
+    lat_min, lon_min = mercator_to_lat_lon(coords[:, [0, 2]].min(), coords[:, [1, 3]].min())
+    lat_max, lon_max = mercator_to_lat_lon(coords[:, [0, 2]].max(), coords[:, [1, 3]].max())
+    conn.executemany("INSERT INTO metadata VALUES (?, ?)", [
+        ("name", "Devon walkable network"),
+        ("format", "pbf"),
+        ("minzoom", str(MIN_ZOOM)),
+        ("maxzoom", str(MAX_ZOOM)),
+        ("graph_fingerprint", graph_fingerprint()),
+        ("bounds", f"{lon_min:.6f},{lat_min:.6f},{lon_max:.6f},{lat_max:.6f}"),
+        ("json", '{"vector_layers": [{"id": "%s", "fields": '
+                 '{"highway": "String", "surface_score": "Number"}}]}' % LAYER_NAME),
+    ])
+
+    for z in range(MIN_ZOOM, MAX_ZOOM + 1):
+        rows = []
+        for x, y, edge_idx in _tiles_for_zoom(coords, z):
+            data = _encode_tile(coords, highways, edge_idx, z, x, y)
+            if data is not None:
+                # MBTiles stores rows in TMS order (y flipped)
+                rows.append((z, x, (2 ** z) - 1 - y, data))
+        conn.executemany("INSERT INTO tiles VALUES (?, ?, ?, ?)", rows)
+        conn.commit()
+        print(f"   Zoom {z}: wrote {len(rows)} tiles")
+
+    conn.close()
+    os.replace(tmp_path, path)
+    print(f"Saved network tiles to {path}")
+
+
+def _tiles_fingerprint(path):
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        row = conn.execute("SELECT value FROM metadata WHERE name = 'graph_fingerprint'").fetchone()
+    except sqlite3.DatabaseError:
+        row = None
+    finally:
+        conn.close()
+    return row[0] if row else None
+
+
+def load_tiles(G, path=TILES_FILE):
+    """Open the tile cache, (re)building it from the graph if missing or stale."""
+    if not os.path.exists(path):
+        build_tiles(G, path)
+    elif _tiles_fingerprint(path) != graph_fingerprint():
+        print(f"Network tiles at {path} are stale, rebuilding...")
+        build_tiles(G, path)
+    print(f"Loading network tiles from {path}...")
+    return sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+
+
+def get_tile(conn, z, x, y):
+    """Return gzipped MVT bytes for an XYZ tile, or None if the tile is empty."""
+    row = conn.execute(
+        "SELECT tile_data FROM tiles WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+        (z, x, (2 ** z) - 1 - y),
+    ).fetchone()
+    return row[0] if row else None
+
+
+if __name__ == "__main__":
+    from app.graph_builder import load_graph
+    build_tiles(load_graph())
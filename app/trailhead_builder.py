@@ -0,0 +1,167 @@
+import os
+import shutil
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+from sqlalchemy import create_engine, text
+from app.graph_builder import DATABASE_URL, graph_fingerprint
+
+TREES_DIR = "devon_trailheads"
+MAX_TRAILHEADS = 300   # Each tree costs ~8 bytes per graph node on disk
+MAX_SNAP_M = 200       # Ignore POIs further than this from the network
+BATCH_SIZE = 16        # Trees computed per Dijkstra call
+
+
+def _fetch_trailheads(engine):
+    """Trailheads, stations and named public car parks, most specific first."""
+    query = text("""
+        SELECT name, ST_X(way) AS x, ST_Y(way) AS y
+        FROM planet_osm_point
+        WHERE highway = 'trailhead'
+           OR railway IN ('station', 'halt')
+           OR (amenity = 'parking' AND name IS NOT NULL
+               AND COALESCE(access, 'yes') NOT IN ('private', 'customers', 'no'))
+        ORDER BY CASE WHEN highway = 'trailhead' THEN 0
+                      WHEN railway IS NOT NULL THEN 1
+                      ELSE 2 END, osm_id
+    """)
+    with engine.connect() as conn:
+        return conn.execute(query).fetchall()
+
+
+def _graph_to_csr(G, node_ids):
+    """Weighted adjacency matrix of the graph, indexed by position in node_ids."""
+    pos = {n: i for i, n in enumerate(node_ids)}
+    rows, cols, weights = [], [], []
+    for u, v, d in G.edges(data=True):
+        if u == v:
+            continue
+        rows.append(pos[u]); cols.append(pos[v])
+        # csgraph treats stored zeros as missing edges
+        weights.append(max(d.get('weight', 0), 1e-6))
+    n = len(node_ids)
+    return csr_matrix((weights, (rows, cols)), shape=(n, n))
+
+
+def build_trees(G, node_ids, kdtree, path=TREES_DIR):
+    """Compute a shortest-path tree from every trailhead and save it as .npy arrays."""
+    print("--- 🥾 BUILDING TRAILHEAD SHORTEST-PATH TREES ---")
+    engine = create_engine(DATABASE_URL)
+
+    print("Step 1/3: Finding trailheads...")
+    pois = _fetch_trailheads(engine)
+    roots = []
+    for poi in pois:
+        dist, idx = kdtree.query([poi.x, poi.y], k=1)
+        if dist <= MAX_SNAP_M and idx not in roots:
+            roots.append(int(idx))
+        if len(roots) >= MAX_TRAILHEADS:
+            break
+    print(f"   Snapped {len(roots)} trailheads from {len(pois)} POIs")
+
+    print("Step 2/3: Building sparse graph...")
+    csr = _graph_to_csr(G, node_ids)
+
+    print(f"Step 3/3: Computing {len(roots)} trees over {len(node_ids)} nodes...")
+    # Build into a fresh directory: a running server may have the current trees memory-mapped
+    tmp_path = path + ".tmp"
+    if os.path.exists(tmp_path):
+        shutil.rmtree(tmp_path)
+    os.makedirs(tmp_path)
+    shape = (len(roots), len(node_ids))
+    pred = np.lib.format.open_memmap(os.path.join(tmp_path, "pred.npy"), mode="w+", dtype=np.int32, shape=shape)
+    cost = np.lib.format.open_memmap(os.path.join(tmp_path, "cost.npy"), mode="w+", dtype=np.float32, shape=shape)
+
+    for i in range(0, len(roots), BATCH_SIZE):
+        batch = roots[i : i + BATCH_SIZE]
+        # The graph is undirected, so each tree also serves routes *to* its root
+        dist, preds = dijkstra(csr, directed=False, indices=batch, return_predecessors=True)
+        preds[preds < 0] = -1
+        pred[i : i + len(batch)] = preds
+        cost[i : i + len(batch)] = dist
+        print(f"   Processed {min(i + BATCH_SIZE, len(roots))} trees...")
+
+    pred.flush(); cost.flush()
+    del pred, cost
+    np.save(os.path.join(tmp_path, "roots.npy"), np.array(roots, dtype=np.int64))
+    np.save(os.path.join(tmp_path, "nodes.npy"), np.asarray(node_ids, dtype=np.int64))
+    with open(os.path.join(tmp_path, "graph_fingerprint.txt"), "w") as f:
+        f.write(graph_fingerprint())
+
+    # Swap directories; open mmaps keep reading the old (unlinked) files
+    old_path = path + ".old"
+    if os.path.exists(old_path):
+        shutil.rmtree(old_path)
+    if os.path.exists(path):
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    if os.path.exists(old_path):
+        shutil.rmtree(old_path)
+    print(f"Saved trailhead trees to {path}")
+
+
+class TrailheadTrees:
+    """Memory-mapped shortest-path trees rooted at popular trailheads."""
+
+    def __init__(self, path, nodes):
+        self.nodes = nodes
+        self.pred = np.load(os.path.join(path, "pred.npy"), mmap_mode="r")
+        self.cost = np.load(os.path.join(path, "cost.npy"), mmap_mode="r")
+        roots = np.load(os.path.join(path, "roots.npy"))
+        self.root_rows = {int(nodes[p]): row for row, p in enumerate(roots)}
+        self._order = np.argsort(nodes)
+        self._sorted = nodes[self._order]
+
+    def __len__(self):
+        return len(self.root_rows)
+
+    def _position(self, node):
+        i = np.searchsorted(self._sorted, node)
+        return int(self._order[i])
+
+    def _walk_back(self, row, node):
+        """Node ids from the tree root to node, or None if unreachable."""
+        pos = self._position(node)
+        if not np.isfinite(self.cost[row, pos]):
+            return None
+        pred = self.pred[row]
+        positions = [pos]
+        while pred[pos] >= 0:
+            # A valid tree path never revisits a node; bail out on a corrupt tree
+            if len(positions) > len(self.nodes):
+                return None
+            pos = pred[pos]
+            positions.append(pos)
+        return [int(n) for n in self.nodes[positions[::-1]]]
+
+    def path(self, start_node, end_node):
+        """Precomputed path between two nodes if either is a trailhead, else None."""
+        if start_node in self.root_rows:
+            return self._walk_back(self.root_rows[start_node], end_node)
+        if end_node in self.root_rows:
+            path = self._walk_back(self.root_rows[end_node], start_node)
+            return path[::-1] if path is not None else None
+        return None
+
+
+def load_trees(node_ids, path=TREES_DIR):
+    """Open the trailhead trees if they were built for this exact graph."""
+    fingerprint_file = os.path.join(path, "graph_fingerprint.txt")
+    if not os.path.exists(fingerprint_file):
+        print(f"No trailhead trees at {path} (run: python -m app.trailhead_builder)")
+        return None
+    with open(fingerprint_file) as f:
+        fingerprint = f.read().strip()
+    nodes = np.load(os.path.join(path, "nodes.npy"))
+    if fingerprint != graph_fingerprint() or not np.array_equal(nodes, np.asarray(node_ids, dtype=np.int64)):
+        print(f"Trailhead trees at {path} are stale, ignoring them (run: python -m app.trailhead_builder)")
+        return None
+    trees = TrailheadTrees(path, nodes)
+    print(f"Loaded {len(trees)} trailhead trees from {path}")
+    return trees
+
+
+if __name__ == "__main__":
+    from app.router import RoutePlanner
+    planner = RoutePlanner()
+    build_trees(planner.graph, planner.node_ids, planner.tree)
@@ -7,17 +7,23 @@ from typing import List, Dict, Any
 from contextlib import asynccontextmanager
 
 from app.router import RoutePlanner, to_gpx
+from app.tile_builder import load_tiles, get_tile, MIN_ZOOM, MAX_ZOOM
 
 router_engine = None
+tile_store = None
+
+TILE_CACHE_SECONDS = 7 * 24 * 3600
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global router_engine
+    global router_engine, tile_store
     print("Starting Devon Walking Route Planner...")
     router_engine = RoutePlanner()
     print("Route planner initialized!")
+    tile_store = load_tiles(router_engine.graph)
     yield
+    tile_store.close()
     print("Shutting down...")
 
 
@@ -106,6 +112,26 @@ async def download_gpx(request: RouteRequest):
     )
 
 
+@app.get("/tiles/{z}/{x}/{y}.pbf")
+async def network_tile(z: int, x: int, y: int):
+    if tile_store is None:
+        raise HTTPException(status_code=503, detail="Network tiles not initialized")
+    
+    if not MIN_ZOOM <= z <= MAX_ZOOM or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise HTTPException(status_code=404, detail="Tile out of range")
+    
+    cache_headers = {"Cache-Control": f"public, max-age={TILE_CACHE_SECONDS}"}
+    data = get_tile(tile_store, z, x, y)
+    if data is None:
+        return Response(status_code=204, headers=cache_headers)
+    
+    return Response(
+        content=data,
+        media_type="application/vnd.mapbox-vector-tile",
+        headers={**cache_headers, "Content-Encoding": "gzip"}
+    )
+
+
 app.mount("/", StaticFiles(directory="static", html=True), name="static")
 
 
@@ -50,6 +50,19 @@ L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
     attribution: '&copy; OpenStreetMap contributors'
 }).addTo(map);
 
+L.vectorGrid.protobuf('/tiles/{z}/{x}/{y}.pbf', {
+    minZoom: 11,
+    maxNativeZoom: 16,
+    interactive: false,
+    vectorTileLayerStyles: {
+        network: (properties) => ({
+            color: COLOR_MAP[properties.highway] || '#6b7280',
+            weight: 1.5,
+            opacity: 0.7
+        })
+    }
+}).addTo(map);
+
 let startMarker = null;
 let endMarker = null;
 let routeLayer = null;